@@ -1,6 +1,6 @@
 """
 app.py — Streamlit Cloud frontend.
-Loads chatui.html and injects BACKEND_URL (Railway FastAPI) via a script tag.
+Embeds the chat UI served by FastAPI's /ui endpoint (Railway) in an iframe.
 No thread startup — FastAPI runs separately on Railway.
 """
 
@@ -33,19 +33,7 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# ── Load chatui.html ─────────────────────────────────────────────────────────
-html_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chatui.html")
-
-if not os.path.exists(html_path):
-    st.error(f"chatui.html not found at: {html_path}")
-    st.write("Files found:", os.listdir(os.path.dirname(os.path.abspath(__file__))))
-    st.stop()
-
-with open(html_path, "r", encoding="utf-8") as f:
-    html_content = f.read()
-
-# Prepend a <script> that sets window.BACKEND_URL before anything else runs
-url_script = f'<script>window.BACKEND_URL = "{BACKEND_URL}";</script>\n'
-final_html = url_script + html_content
-
-components.html(final_html, height=820, scrolling=False)
\ No newline at end of file
+# ── Embed chatui.html from the backend ───────────────────────────────────────
+# FastAPI serves the page pre-gzipped with cache headers, so a Streamlit rerun
+# only re-sends the iframe URL instead of the whole HTML document.
+components.iframe(f"{BACKEND_URL}/ui", height=820, scrolling=False)
\ No newline at end of file
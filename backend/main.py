@@ -1,40 +1,229 @@
 """
 backend/main.py — FastAPI entry point.
 CORS is enabled so Streamlit Cloud (and any origin) can call this API.
+Also serves the chat UI (chatui.html) at /ui for the Streamlit iframe.
 """
 
-from fastapi import FastAPI
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
 from backend.models import ChatRequest, ChatResponse
-from backend.services.agent_service import run_agent
+from config import ALLOWED_ORIGINS
+
+logger = logging.getLogger(__name__)
+
+
+# ── Heavy services are imported lazily ───────────────────────────────────────
+# agent_service pulls in LangChain + pandas and builds the agent; chart_service
+# pulls in matplotlib. Importing them at module load would delay the port bind
+# by seconds on a cold start, so they load on first use (Python caches the
+# module afterwards) and are pre-warmed in the background at startup.
+# Async endpoints import through the threadpool: a first import (or one waiting
+# on the warm-up thread's import lock) must not block the event loop.
+def _agent_service():
+    from backend.services import agent_service
+    return agent_service
+
+
+def _chart_service():
+    from backend.services import chart_service
+    return chart_service
+
+
+def _warm_services() -> None:
+    _agent_service().get_agent()
+    _chart_service().prerender_all()
+
+
+def _log_warm_failure(future: asyncio.Future) -> None:
+    # Nothing awaits the warm-up, so surface its error here rather than as a
+    # "Future exception was never retrieved" warning at garbage collection.
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Startup warm-up failed", exc_info=future.exception())
 
-app = FastAPI(title="Titanic Chat API")
 
-# ── CORS — required so Streamlit Cloud's iframe JS can call this API ──────────
-# allow_origins=["*"] is safe here because this is a read-only public chatbot.
-# If you add auth later, restrict this to your Streamlit Cloud URL.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Fire and forget — health checks succeed while the warm-up runs
+    warm_up = asyncio.get_running_loop().run_in_executor(None, _warm_services)
+    warm_up.add_done_callback(_log_warm_failure)
+    yield
+
+
+app = FastAPI(title="Titanic Chat API", lifespan=lifespan)
+
+# ── CORS — lets a UI hosted on another origin call this API ──────────────────
+# ALLOWED_ORIGINS defaults to "*", which is safe for a read-only public chatbot.
+# If you add auth later, restrict it to your Streamlit Cloud URL. Methods and
+# headers are explicit: the chat UI only ever sends Content-Type.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=False,
-    allow_methods=["GET", "POST"],
-    allow_headers=["*"],
+    allow_methods=("GET", "POST"),
+    allow_headers=("Content-Type",),
 )
 
+# ── Compression — long /chat answers and SVG charts shrink on the wire.
+# Starlette skips bodies that already have a Content-Encoding (/ui) and
+# text/event-stream, so streaming still flushes per token. ────────────────────
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Accept-Encoding negotiation for gzip, honouring q-values ("gzip;q=0" is a refusal)."""
+    wildcard = None
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if coding not in ("gzip", "x-gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard = q > 0
+        else:
+            return q > 0
+    return bool(wildcard)
+
+
+class _GZipMiddleware(GZipMiddleware):
+    # Starlette only checks for the substring "gzip", so "gzip;q=0" would
+    # still get a compressed body. Clients that refuse gzip bypass it.
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and not _accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(_GZipMiddleware, minimum_size=512, compresslevel=5)
+
+# ── Chat UI — read and gzipped once at import, never per request ──────────────
+# The URL is not versioned, so use a short max-age plus an ETag rather than
+# "immutable": a redeploy with a new chatui.html must reach browsers.
+_CHAT_UI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chatui.html")
+with open(_CHAT_UI_PATH, "rb") as f:
+    _CHAT_UI = f.read()
+_CHAT_UI_GZ = gzip.compress(_CHAT_UI, compresslevel=9)
+# The two encodings are different byte sequences, so each gets its own strong ETag
+_CHAT_UI_HASH = hashlib.sha1(_CHAT_UI).hexdigest()
+_CHAT_UI_ETAG = f'"{_CHAT_UI_HASH}"'
+_CHAT_UI_GZ_ETAG = f'"{_CHAT_UI_HASH}-gz"'
+_CHAT_UI_HEADERS = {
+    "Cache-Control": "public, max-age=3600",
+    "ETag": _CHAT_UI_ETAG,
+    "Vary": "Accept-Encoding",
+}
+_CHAT_UI_GZ_HEADERS = {**_CHAT_UI_HEADERS, "ETag": _CHAT_UI_GZ_ETAG, "Content-Encoding": "gzip"}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check: "*" or any listed tag, using weak comparison (W/ ignored)."""
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+# ── Static assets (self-hosted fonts) ────────────────────────────────────────
+# File names carry the font version, so a changed file gets a new URL and the
+# old one can be cached forever. WOFF2 is already compressed — GZipMiddleware
+# skips font/woff2 by default.
+class _ImmutableStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+_STATIC_DIR = os.path.join(os.path.dirname(_CHAT_UI_PATH), "static")
+app.mount("/static", _ImmutableStaticFiles(directory=_STATIC_DIR), name="static")
+
+# ── Health — pre-serialized body, no dict/JSON work per ping ─────────────────
+# A fresh Response per call: middleware appends headers to it in place.
+_HEALTH_BODY = b'{"status":"ok"}'
+_HEALTH_HEADERS = {"Cache-Control": "public, max-age=10"}
+
 
 @app.get("/health")
-async def health():
-    return {"status": "ok"}
+async def health() -> Response:
+    return Response(_HEALTH_BODY, media_type="application/json", headers=_HEALTH_HEADERS)
+
+
+@app.get("/ui")
+async def ui(request: Request) -> Response:
+    # Pre-gzipped copy only for clients that accept it; the raw bytes otherwise
+    if _accepts_gzip(request.headers.get("accept-encoding", "")):
+        body, headers = _CHAT_UI_GZ, _CHAT_UI_GZ_HEADERS
+    else:
+        body, headers = _CHAT_UI, _CHAT_UI_HEADERS
+    if _etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers={"ETag": headers["ETag"], "Vary": "Accept-Encoding"})
+    return Response(body, media_type="text/html", headers=headers)
+
+
+def _to_response(result: dict) -> ChatResponse:
+    chart_type = result.get("chart_type")
+    return ChatResponse(
+        answer=result["answer"],
+        chart_url=f"/chart/{chart_type}" if chart_type else None,
+        chart_type=chart_type,
+    )
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
-    result = run_agent(
+async def chat(request: ChatRequest) -> Response:
+    # run_agent awaits the LLM — the event loop keeps serving other requests
+    agent_service = await run_in_threadpool(_agent_service)
+    result = await agent_service.run_agent(
         question=request.question,
         history=request.history or [],
     )
-    return ChatResponse(
-        answer=result["answer"],
-        chart_base64=result.get("chart_base64"),
-        chart_type=result.get("chart_type"),
-    )
\ No newline at end of file
+    # Serialize in pydantic-core (Rust) straight to bytes — skips
+    # jsonable_encoder + stdlib json.dumps.
+    return Response(_to_response(result).model_dump_json(), media_type="application/json")
+
+
+# Same contract as /chat, streamed as Server-Sent Events: "token" events carry
+# answer text deltas, a "reset" event drops text that turned out to precede a
+# tool call, then one "done" event carries the full ChatResponse.
+# /chat stays as the buffered fallback for clients that can't read streams.
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    agent_service = await run_in_threadpool(_agent_service)
+
+    async def events():
+        async for event in agent_service.stream_agent(question=request.question, history=request.history or []):
+            if "token" in event:
+                yield f"event: token\ndata: {json.dumps(event)}\n\n"
+            elif "reset" in event:
+                yield "event: reset\ndata: {}\n\n"
+            else:
+                yield f"event: done\ndata: {_to_response(event).model_dump_json()}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+# A raw image instead of base64-in-JSON: fewer bytes, no encode/decode, and the
+# browser caches it. Plain `def` so a first (uncached) render runs in the threadpool.
+@app.get("/chart/{chart_type}")
+def chart(chart_type: str) -> Response:
+    render = _chart_service().CHARTS.get(chart_type)
+    if render is None:
+        raise HTTPException(status_code=404, detail=f"Unknown chart: {chart_type}")
+    return Response(render(), media_type="image/svg+xml", headers={"Cache-Control": "public, max-age=3600"})
\ No newline at end of file
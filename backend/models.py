@@ -3,28 +3,32 @@ backend/models.py — Pydantic request/response schemas for the FastAPI API.
 Defines the contract between Streamlit frontend and FastAPI backend.
 """
 
-from pydantic import BaseModel, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, Literal, Optional, List
+
+# Requests are parsed once and never mutated, so models are frozen. Validation
+# is declarative so it runs inside pydantic-core instead of Python validators.
 
 class ChatMessage(BaseModel):
-    role: str
+    model_config = ConfigDict(frozen=True)
+
+    role: Literal["user", "assistant", "system"]
     content: str
 
 class ChatRequest(BaseModel):
-    question: str
-    history: List[ChatMessage] = []
+    model_config = ConfigDict(frozen=True)
 
-    @field_validator("question")
-    @classmethod
-    def question_must_not_be_empty(cls, v: str) -> str:
-        v = v.strip()
-        if not v:
-            raise ValueError("Question must not be empty.")
-        return v
+    # Stripped, and must not be empty
+    question: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+    # The UI sends at most the last 10 exchanges; the cap stops validation
+    # early on oversized bodies. Keep in sync with MAX_HISTORY in chatui.html.
+    history: List[ChatMessage] = Field(default=[], max_length=20)
 
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     answer: str
-    chart_base64: Optional[str] = None   # Base64 PNG string if a chart was generated
-    chart_type: Optional[str] = None     # e.g. "histogram", "bar", "pie"
+    chart_url: Optional[str] = None      # e.g. "/chart/age_histogram" if a chart was generated
+    chart_type: Optional[str] = None     # CHARTS key, e.g. "age_histogram", "survival_pie_chart" (the /chart/{name} segment)
     error: Optional[str] = None          # Non-null if something went wrong
@@ -1,48 +1,64 @@
 """
 backend/services/agent_service.py — LangChain agent using LangGraph.
 Uses ChatGroq + langgraph create_react_agent (modern LangChain 1.x pattern).
-Built once as a module-level singleton.
+Built lazily, once per process, on first use (see get_agent).
 """
 
+import asyncio
 import logging
 import sys
 import os
+import threading
+from contextvars import ContextVar
+from functools import lru_cache
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
-from langchain_groq import ChatGroq
 from langchain_core.tools import tool
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langgraph.prebuilt import create_react_agent
+from langchain_core.messages import HumanMessage, AIMessage
 
 from config import GROQ_API_KEY, GROQ_MODEL
-from backend.services import data_service, chart_service
+from backend.services import data_service
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# Chart registry — stores the last generated chart so the LLM is never
-# given a raw base64 string (would overflow context and cause hangs).
+# Chart registry — records which chart the LLM asked for. The image itself is
+# never rendered here or shown to the LLM; the browser fetches it from
+# /chart/{type} (see chart_service.CHARTS).
+#
+# Each run_agent/stream_agent call binds its own dict, so concurrent requests
+# can't overwrite each other's chart. LangChain runs sync tools in an executor
+# with a copy of the caller's context, which still points at that same dict.
 # ---------------------------------------------------------------------------
-_chart_registry: dict = {"base64": None, "type": None}
+_chart_registry: ContextVar[dict] = ContextVar("chart_registry")
+
+
+def _set_chart(chart_type: str) -> None:
+    registry = _chart_registry.get(None)
+    if registry is None:
+        return  # tool invoked outside run_agent/stream_agent — nothing to record
+    registry["type"] = chart_type
 
 # ---------------------------------------------------------------------------
-# System prompt — built dynamically from actual dataset at startup
+# System prompt — built dynamically from actual dataset when the agent is built
 # ---------------------------------------------------------------------------
+@lru_cache(maxsize=1)
 def _build_system_prompt() -> str:
     """
-    Compute key dataset facts once at startup and inject them into the system
-    prompt. This way no numbers are ever hardcoded — if the CSV changes, the
-    prompt stays accurate automatically.
+    Compute key dataset facts once and inject them into the system prompt.
+    This way no numbers are ever hardcoded — if the CSV changes, the prompt
+    stays accurate automatically. Deferred to build_agent() so importing this
+    module doesn't parse the CSV.
     """
     try:
-        df = data_service.get_dataframe()
-        total       = len(df)
-        survived    = int(df["Survived"].sum())
+        stats = data_service.get_summary_stats()
+        total       = stats["total"]
+        survived    = stats["survived"]
         not_survived = total - survived
-        survival_pct = round(df["Survived"].mean() * 100, 2)
+        survival_pct = round(stats["survival_rate"] * 100, 2)
     except Exception as e:
-        # Fallback if dataset unavailable at import time
+        # Fallback if dataset unavailable when the agent is built
         logger.warning(f"Could not load dataset for system prompt: {e}")
         total, survived, not_survived, survival_pct = "unknown", "unknown", "unknown", "unknown"
 
@@ -71,8 +87,6 @@ def _build_system_prompt() -> str:
         "not survive.'"
     )
 
-SYSTEM_PROMPT = _build_system_prompt()
-
 # ---------------------------------------------------------------------------
 # Tool definitions
 # ---------------------------------------------------------------------------
@@ -134,49 +148,37 @@ def get_survival_by_sex() -> str:
 @tool
 def age_histogram() -> str:
     """Generates a histogram of passenger age distribution. Use when user asks for an age chart or age histogram."""
-    b64 = chart_service.age_histogram()
-    _chart_registry["base64"] = b64
-    _chart_registry["type"] = "age_histogram"
+    _set_chart("age_histogram")
     return "Age distribution histogram generated and will be displayed to the user."
 
 @tool
 def embarkation_bar_chart() -> str:
     """Generates a bar chart of passengers per embarkation port. Use when user asks for an embarkation chart."""
-    b64 = chart_service.embarkation_bar_chart()
-    _chart_registry["base64"] = b64
-    _chart_registry["type"] = "embarkation_bar_chart"
+    _set_chart("embarkation_bar_chart")
     return "Embarkation port bar chart generated and will be displayed to the user."
 
 @tool
 def survival_pie_chart() -> str:
     """Generates a pie chart of survived vs did-not-survive passengers. Use when user asks for a survival chart."""
-    b64 = chart_service.survival_pie_chart()
-    _chart_registry["base64"] = b64
-    _chart_registry["type"] = "survival_pie_chart"
+    _set_chart("survival_pie_chart")
     return "Survival pie chart generated and will be displayed to the user."
 
 @tool
 def sex_distribution_pie_chart() -> str:
     """Generates a pie chart showing the distribution of male and female passengers. Use when the user asks for a chart of males and females, or sex distribution."""
-    b64 = chart_service.sex_distribution_pie_chart()
-    _chart_registry["base64"] = b64
-    _chart_registry["type"] = "sex_distribution_pie_chart"
+    _set_chart("sex_distribution_pie_chart")
     return "Sex distribution pie chart generated and will be displayed to the user."
 
 @tool
 def survival_by_class_bar_chart() -> str:
     """Generates a bar chart of survival by passenger class (1st, 2nd, 3rd). Use when asked about class survival."""
-    b64 = chart_service.survival_by_class_bar_chart()
-    _chart_registry["base64"] = b64
-    _chart_registry["type"] = "survival_by_class_bar_chart"
+    _set_chart("survival_by_class_bar_chart")
     return "Survival by class bar chart generated and will be displayed to the user."
 
 @tool
 def top_wealthiest_bar_chart() -> str:
     """Generates a horizontal bar chart of the top 50 wealthiest passengers by ticket fare. Use when user asks for a chart of the wealthiest, richest, or top passengers."""
-    b64 = chart_service.top_wealthiest_bar_chart()
-    _chart_registry["base64"] = b64
-    _chart_registry["type"] = "top_wealthiest_bar_chart"
+    _set_chart("top_wealthiest_bar_chart")
     return "Top 50 wealthiest passengers chart generated and will be displayed to the user."
 
 ALL_TOOLS = [
@@ -200,10 +202,14 @@ ALL_TOOLS = [
 
 
 def build_agent():
-    """Build and return the LangGraph react agent. Called once at startup."""
+    """Build and return the LangGraph react agent. Use get_agent() for the cached instance."""
     if not GROQ_API_KEY:
         raise RuntimeError("GROQ_API_KEY is not set. Please add it to your .env file.")
 
+    # Heavy imports — only needed once, when the graph is actually built
+    from langchain_groq import ChatGroq
+    from langgraph.prebuilt import create_react_agent
+
     llm = ChatGroq(
         api_key=GROQ_API_KEY,
         model=GROQ_MODEL,
@@ -213,7 +219,7 @@ def build_agent():
     graph = create_react_agent(
         model=llm,
         tools=ALL_TOOLS,
-        prompt=SYSTEM_PROMPT,
+        prompt=_build_system_prompt(),
     )
 
     tool_names = [t.name for t in ALL_TOOLS]
@@ -222,14 +228,36 @@ def build_agent():
 
 
 # ---------------------------------------------------------------------------
-# Module-level singleton
+# Per-process singleton — compiled on first use (or by the startup warm-up in
+# main.py) and reused by every request. A failed build is cached as None so
+# requests get the "unavailable" answer instead of retrying the build.
+# The lock makes a request that races the warm-up thread wait for its build
+# instead of compiling a second graph.
 # ---------------------------------------------------------------------------
-try:
-    agent_graph = build_agent()
-    logger.info("Agent graph ready.")
-except Exception as e:
-    agent_graph = None
-    logger.error(f"FAILED to build agent: {e}", exc_info=True)
+_UNBUILT = object()
+_agent = _UNBUILT
+_agent_lock = threading.Lock()
+
+
+def get_agent():
+    """Return the compiled agent graph, building it on first call. None if the build failed.
+    Blocking on first call — async code should run it via asyncio.to_thread."""
+    global _agent
+    if _agent is _UNBUILT:
+        with _agent_lock:
+            if _agent is _UNBUILT:
+                try:
+                    _agent = build_agent()
+                    logger.info("Agent graph ready.")
+                except Exception as e:
+                    logger.error(f"FAILED to build agent: {e}", exc_info=True)
+                    _agent = None
+    return _agent
+
+
+# Chat roles the agent sees, mapped to their LangChain message class.
+# Any other role (e.g. "system") is dropped from the history.
+_ROLE_CLS = {"user": HumanMessage, "assistant": AIMessage}
 
 
 def _build_messages(history: list, question: str) -> list:
@@ -242,33 +270,37 @@ def _build_messages(history: list, question: str) -> list:
     """
     msgs = []
 
-    if history:
-        for msg in history:
-            # Safely extract role and content regardless of dict vs object
-            if isinstance(msg, dict):
-                role = msg.get("role", "")
-                content = msg.get("content", "")
-            else:
-                role = getattr(msg, "role", "")
-                content = getattr(msg, "content", "")
-
-            # Skip empty messages — they confuse the agent
-            if not content or not content.strip():
-                continue
+    for msg in history or ():
+        # Safely extract role and content regardless of dict vs object
+        if isinstance(msg, dict):
+            role = msg.get("role", "")
+            content = msg.get("content", "")
+        else:
+            role = getattr(msg, "role", "")
+            content = getattr(msg, "content", "")
 
-            if role == "user":
-                msgs.append(HumanMessage(content=content))
-            elif role == "assistant":
-                # Only include assistant messages that have real text content.
-                # Skip messages that were just chart notifications with no text.
-                if content and content.strip():
-                    msgs.append(AIMessage(content=content))
+        # Skip empty messages (e.g. chart-only notifications) — they confuse the agent
+        cls = _ROLE_CLS.get(role)
+        if cls and content and content.strip():
+            msgs.append(cls(content=content))
 
     # Always append the current user question last
     msgs.append(HumanMessage(content=question))
     return msgs
 
 
+def _ai_text(msg) -> str:
+    """Return the text of an AI/assistant message, or "" for anything else."""
+    msg_type = getattr(msg, "type", "") or getattr(msg, "role", "")
+    # Tool results and other roles never hold the answer
+    if msg_type not in ("ai", "assistant"):
+        return ""
+    content = getattr(msg, "content", "")
+    # IMPORTANT: empty-content AI messages are tool-call invocation messages,
+    # not final answers
+    return content if content and content.strip() else ""
+
+
 def _extract_answer(result: dict) -> str:
     """
     Extract the final text answer from the LangGraph agent result.
@@ -280,30 +312,66 @@ def _extract_answer(result: dict) -> str:
         where the LLM decided to call a tool but hasn't produced text yet)
     """
     messages = result.get("messages", [])
-    logger.info(f"Agent returned {len(messages)} message(s)")
+    logger.debug("Agent returned %d message(s)", len(messages))
 
+    # In a normal ReAct trace the last message is the final answer, so this
+    # returns on the first iteration; older messages are only checked otherwise.
     for msg in reversed(messages):
-        msg_type = getattr(msg, "type", "") or getattr(msg, "role", "")
+        answer = _ai_text(msg)
+        if answer:
+            return answer
 
-        # Skip tool result messages entirely
-        if msg_type == "tool":
-            continue
+    return ""
 
-        # Only consider AI/assistant messages
-        if msg_type in ("ai", "assistant"):
-            content = getattr(msg, "content", "")
-            # IMPORTANT: skip empty-content AI messages — these are tool-call
-            # invocation messages, not final answers
-            if content and content.strip():
-                logger.info(f"Found final answer: {content[:100]!r}...")
-                return content
 
-    return ""
+# ---------------------------------------------------------------------------
+# Shared pieces of run_agent / stream_agent
+# ---------------------------------------------------------------------------
+async def _resolve_agent():
+    # The first call builds the graph (imports, dataset load) — keep that off
+    # the event loop so /health and other requests aren't stalled.
+    return await asyncio.to_thread(get_agent)
+
+
+def _bind_chart_registry() -> dict:
+    """Fresh chart registry for this call; tools record their chart in it."""
+    chart = {"type": None}
+    _chart_registry.set(chart)
+    return chart
+
+
+def _unavailable_result() -> dict:
+    return {
+        "answer": "⚠️ Agent is unavailable. Check your GROQ_API_KEY in the .env file and restart.",
+        "chart_type": None,
+    }
+
 
+def _final_result(result: dict, chart: dict) -> dict:
+    answer = _extract_answer(result)
 
-def run_agent(question: str, history: list = None) -> dict:
+    if not answer:
+        answer = "I processed your request but couldn't generate a text response. Please try rephrasing."
+
+    return {
+        "answer": answer,
+        "chart_type": chart["type"],
+    }
+
+
+def _error_result(question: str, e: Exception) -> dict:
+    logger.exception(f"Agent error for {question!r}: {e}")
+    return {
+        "answer": f"⚠️ Error: {str(e)}",
+        "chart_type": None,
+    }
+
+
+async def run_agent(question: str, history: list = None) -> dict:
     """
     Invoke the agent with a user question and chat history.
+    Async so the Groq round-trips don't tie up a thread; the sync tools are run
+    in an executor by LangChain.
 
     Args:
         question: The current user question.
@@ -311,18 +379,13 @@ def run_agent(question: str, history: list = None) -> dict:
                   Pass the full st.session_state.messages list from Streamlit.
 
     Returns:
-        dict with keys: answer (str), chart_base64 (str|None), chart_type (str|None)
+        dict with keys: answer (str), chart_type (str|None)
     """
+    agent_graph = await _resolve_agent()
     if agent_graph is None:
-        return {
-            "answer": "⚠️ Agent is unavailable. Check your GROQ_API_KEY in the .env file and restart.",
-            "chart_base64": None,
-            "chart_type": None,
-        }
+        return _unavailable_result()
 
-    # Reset chart registry before each call
-    _chart_registry["base64"] = None
-    _chart_registry["type"] = None
+    chart = _bind_chart_registry()
 
     try:
         logger.info(f"Running agent | question={question!r} | history_len={len(history) if history else 0}")
@@ -330,25 +393,67 @@ def run_agent(question: str, history: list = None) -> dict:
         messages = _build_messages(history or [], question)
         logger.info(f"Sending {len(messages)} message(s) to agent")
 
-        result = agent_graph.invoke({"messages": messages})
+        result = await agent_graph.ainvoke({"messages": messages})
 
-        answer = _extract_answer(result)
+        final = _final_result(result, chart)
+        logger.info(f"Final answer: {final['answer'][:120]!r}")
+        return final
 
-        if not answer:
-            answer = "I processed your request but couldn't generate a text response. Please try rephrasing."
+    except Exception as e:
+        return _error_result(question, e)
 
-        logger.info(f"Final answer: {answer[:120]!r}")
 
-        return {
-            "answer": answer,
-            "chart_base64": _chart_registry.get("base64"),
-            "chart_type": _chart_registry.get("type"),
-        }
+async def stream_agent(question: str, history: list = None):
+    """
+    Stream the agent's answer as it is generated.
+
+    Same inputs as run_agent. Yields {"token": str} for each text delta the LLM
+    produces, then exactly one final dict shaped like run_agent's return value:
+    {"answer": str, "chart_type": str|None}.
+
+    Text is streamed as it arrives, before it is known whether that LLM turn
+    ends in a tool call. If it does, {"reset": True} is yielded so the client
+    discards the pre-tool text; only the final answer's tokens remain.
+    """
+    agent_graph = await _resolve_agent()
+    if agent_graph is None:
+        yield _unavailable_result()
+        return
+
+    chart = _bind_chart_registry()
+
+    try:
+        logger.info(f"Streaming agent | question={question!r} | history_len={len(history) if history else 0}")
+
+        messages = _build_messages(history or [], question)
+        result = {}
+        tool_turns = set()  # ids of LLM messages that turned out to call tools
+        streamed_id = None  # id of the LLM message whose text the client shows
+
+        # "messages" mode yields LLM token chunks; "values" yields full graph
+        # state after each step — the last one is what ainvoke() would return.
+        async for mode, chunk in agent_graph.astream({"messages": messages}, stream_mode=["messages", "values"]):
+            if mode == "values":
+                result = chunk
+                continue
+            msg, metadata = chunk
+            # Only text from the LLM node — tool outputs are not for the user
+            if metadata.get("langgraph_node") != "agent":
+                continue
+            if getattr(msg, "tool_call_chunks", None) or getattr(msg, "tool_calls", None):
+                # A tool step, not the answer: take back any text already sent
+                if streamed_id is not None and streamed_id == msg.id:
+                    yield {"reset": True}
+                    streamed_id = None
+                tool_turns.add(msg.id)
+                continue
+            if msg.id in tool_turns:
+                continue
+            if isinstance(msg.content, str) and msg.content:
+                streamed_id = msg.id
+                yield {"token": msg.content}
+
+        yield _final_result(result, chart)
 
     except Exception as e:
-        logger.exception(f"Agent error for {question!r}: {e}")
-        return {
-            "answer": f"⚠️ Error: {str(e)}",
-            "chart_base64": None,
-            "chart_type": None,
-        }
\ No newline at end of file
+        yield _error_result(question, e)
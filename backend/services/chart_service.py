@@ -1,21 +1,20 @@
 """
 backend/services/chart_service.py — Single responsibility: generating charts.
-Returns base64-encoded PNG strings for JSON transport.
+Returns SVG documents (bytes), served by the FastAPI /chart/{name} endpoint.
 All matplotlib operations live here.
+The dataset is static, so each chart is rendered once per process and cached.
 """
 
 import io
-import base64
 import logging
-import matplotlib
-matplotlib.use("Agg")  # Non-interactive backend — required for server environments
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+from functools import lru_cache
+import numpy as np
 import sys
 import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 from backend.services.data_service import (
+    PORT_LABELS,
     get_dataframe,
     get_age_data,
     get_embarkation_counts,
@@ -35,6 +34,9 @@ PALETTE = {
     "text": "#E0E0E0",
 }
 
+# Short class names for axis ticks (data_service.CLASS_LABELS is the long form)
+CLASS_TICK_LABELS = {1: "1st Class", 2: "2nd Class", 3: "3rd Class"}
+
 
 def _apply_dark_style(ax, fig) -> None:
     """Apply consistent dark theme to any matplotlib axes."""
@@ -48,38 +50,57 @@ def _apply_dark_style(ax, fig) -> None:
         spine.set_edgecolor("#444455")
 
 
-def fig_to_base64(fig) -> str:
-    """Convert any matplotlib figure to a base64 PNG string for JSON transport."""
+def _new_chart(figsize: tuple) -> tuple:
+    """Create a standalone Figure and its single Axes.
+    Built directly instead of via pyplot, so there is no global figure
+    manager to register with (or close afterwards) and renders running in
+    different threads never share pyplot state.
+    matplotlib is imported here, on first render, to keep it off the import path."""
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize, layout="constrained")
+    return fig, fig.subplots()
+
+
+def fig_to_svg(fig) -> bytes:
+    """Render any matplotlib figure to an SVG document.
+    Vector output skips Agg rasterisation and PNG compression entirely, and
+    these simple charts gzip to a fraction of the PNG size.
+    Figures use constrained layout, so there is no bbox_inches="tight" —
+    that costs a second full draw pass just to measure the bounding box."""
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight", dpi=120)
-    buf.seek(0)
-    encoded = base64.b64encode(buf.read()).decode("utf-8")
-    plt.close(fig)
-    return encoded
-
-
-def age_histogram() -> str:
-    """Generates a histogram of passenger ages. Returns base64 PNG."""
-    ages = get_age_data()
-    fig, ax = plt.subplots(figsize=(8, 5))
-    ax.hist(ages, bins=20, color=PALETTE["blue"], edgecolor=PALETTE["bg"], linewidth=0.8, alpha=0.9)
+    fig.savefig(buf, format="svg")
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=1)
+def age_histogram() -> bytes:
+    """Generates a histogram of passenger ages. Returns SVG bytes."""
+    # Bin with NumPy and draw plain bars — same output as ax.hist, without
+    # matplotlib's histogram/patch pipeline on top
+    counts, edges = np.histogram(get_age_data(), bins=20)
+    fig, ax = _new_chart((8, 5))
+    ax.bar(
+        edges[:-1], counts, width=np.diff(edges), align="edge",
+        color=PALETTE["blue"], edgecolor=PALETTE["bg"], linewidth=0.8, alpha=0.9,
+    )
     ax.set_title("Distribution of Passenger Ages", fontsize=14, fontweight="bold", pad=15)
     ax.set_xlabel("Age", fontsize=11)
     ax.set_ylabel("Number of Passengers", fontsize=11)
     _apply_dark_style(ax, fig)
     logger.info("Generated age histogram")
-    return fig_to_base64(fig)
+    return fig_to_svg(fig)
 
 
-def embarkation_bar_chart() -> str:
-    """Generates a bar chart of passengers per embarkation port. Returns base64 PNG."""
+@lru_cache(maxsize=1)
+def embarkation_bar_chart() -> bytes:
+    """Generates a bar chart of passengers per embarkation port. Returns SVG bytes."""
     df = get_dataframe()
-    port_labels = {"S": "Southampton", "C": "Cherbourg", "Q": "Queenstown"}
     counts = df["Embarked"].value_counts()
-    labels = [port_labels.get(k, k) for k in counts.index]
+    labels = counts.index.map(lambda k: PORT_LABELS.get(k, k)).tolist()
     colors = [PALETTE["blue"], PALETTE["coral"], PALETTE["green"]]
 
-    fig, ax = plt.subplots(figsize=(7, 5))
+    fig, ax = _new_chart((7, 5))
     bars = ax.bar(labels, counts.values, color=colors, edgecolor=PALETTE["bg"], linewidth=0.8)
     ax.set_title("Passengers by Embarkation Port", fontsize=14, fontweight="bold", pad=15)
     ax.set_ylabel("Number of Passengers", fontsize=11)
@@ -93,11 +114,12 @@ def embarkation_bar_chart() -> str:
         )
     _apply_dark_style(ax, fig)
     logger.info("Generated embarkation bar chart")
-    return fig_to_base64(fig)
+    return fig_to_svg(fig)
 
 
-def survival_pie_chart() -> str:
-    """Generates a pie chart showing survival rates. Returns base64 PNG."""
+@lru_cache(maxsize=1)
+def survival_pie_chart() -> bytes:
+    """Generates a pie chart showing survival rates. Returns SVG bytes."""
     df = get_dataframe()
     survived = df["Survived"].sum()
     not_survived = len(df) - survived
@@ -106,7 +128,7 @@ def survival_pie_chart() -> str:
     colors = [PALETTE["green"], PALETTE["coral"]]
     explode = (0.05, 0)
 
-    fig, ax = plt.subplots(figsize=(7, 5))
+    fig, ax = _new_chart((7, 5))
     wedges, texts, autotexts = ax.pie(
         values,
         labels=labels,
@@ -121,35 +143,36 @@ def survival_pie_chart() -> str:
     ax.set_title("Passenger Survival Distribution", fontsize=14, fontweight="bold", pad=15)
     fig.patch.set_facecolor(PALETTE["bg"])
     logger.info("Generated survival pie chart")
-    return fig_to_base64(fig)
+    return fig_to_svg(fig)
 
 
-def survival_by_class_bar_chart() -> str:
-    """Generates a grouped bar chart of survival by passenger class. Returns base64 PNG."""
+@lru_cache(maxsize=1)
+def survival_by_class_bar_chart() -> bytes:
+    """Generates a grouped bar chart of survival by passenger class. Returns SVG bytes."""
     df = get_dataframe()
-    class_labels = {1: "1st Class", 2: "2nd Class", 3: "3rd Class"}
-    groups = df.groupby("Pclass")["Survived"].agg(["sum", "count"])
-    classes = [class_labels[c] for c in groups.index]
-    survived = groups["sum"].tolist()
-    not_survived = (groups["count"] - groups["sum"]).tolist()
+    groups = df.groupby("Pclass", observed=True)["Survived"].agg(["sum", "count"])
+    classes = groups.index.map(CLASS_TICK_LABELS).tolist()
+    survived = groups["sum"].to_numpy()
+    not_survived = groups["count"].to_numpy() - survived
 
-    x = range(len(classes))
+    x = np.arange(len(classes))
     width = 0.35
-    fig, ax = plt.subplots(figsize=(8, 5))
-    b1 = ax.bar([i - width / 2 for i in x], survived, width, label="Survived", color=PALETTE["green"])
-    b2 = ax.bar([i + width / 2 for i in x], not_survived, width, label="Did Not Survive", color=PALETTE["coral"])
-    ax.set_xticks(list(x))
+    fig, ax = _new_chart((8, 5))
+    b1 = ax.bar(x - width / 2, survived, width, label="Survived", color=PALETTE["green"])
+    b2 = ax.bar(x + width / 2, not_survived, width, label="Did Not Survive", color=PALETTE["coral"])
+    ax.set_xticks(x)
     ax.set_xticklabels(classes)
     ax.set_title("Survival by Passenger Class", fontsize=14, fontweight="bold", pad=15)
     ax.set_ylabel("Number of Passengers", fontsize=11)
     ax.legend(facecolor="#2A2A3E", labelcolor=PALETTE["text"])
     _apply_dark_style(ax, fig)
     logger.info("Generated survival by class bar chart")
-    return fig_to_base64(fig)
+    return fig_to_svg(fig)
 
 
-def sex_distribution_pie_chart() -> str:
-    """Generates a pie chart of male vs female distribution. Returns base64 PNG."""
+@lru_cache(maxsize=1)
+def sex_distribution_pie_chart() -> bytes:
+    """Generates a pie chart of male vs female distribution. Returns SVG bytes."""
     df = get_dataframe()
     counts = df["Sex"].value_counts()
     
@@ -160,7 +183,7 @@ def sex_distribution_pie_chart() -> str:
     colors = [PALETTE["blue"], PALETTE["purple"]]
     explode = (0.05, 0)
 
-    fig, ax = plt.subplots(figsize=(7, 5))
+    fig, ax = _new_chart((7, 5))
     wedges, texts, autotexts = ax.pie(
         counts.values,
         labels=labels,
@@ -175,26 +198,27 @@ def sex_distribution_pie_chart() -> str:
     ax.set_title("Passenger Sex Distribution", fontsize=14, fontweight="bold", pad=15)
     fig.patch.set_facecolor(PALETTE["bg"])
     logger.info("Generated sex distribution pie chart")
-    return fig_to_base64(fig)
+    return fig_to_svg(fig)
 
 
 
-def top_wealthiest_bar_chart() -> str:
-    """Generates a horizontal bar chart of the top 50 wealthiest passengers by fare. Returns base64 PNG."""
+@lru_cache(maxsize=1)
+def top_wealthiest_bar_chart() -> bytes:
+    """Generates a horizontal bar chart of the top 50 wealthiest passengers by fare. Returns SVG bytes."""
     df_top = get_top_wealthiest_passengers(50)
     
     # We want highest fare at the top, so we sort ascending before plotting horizontal bars
     df_plot = df_top.sort_values(by="Fare", ascending=True)
     
-    names = df_plot["Name"].tolist()
-    fares = df_plot["Fare"].tolist()
+    names = df_plot["Name"]
+    fares = df_plot["Fare"].to_numpy()
 
     # For 50 passengers, we need a very tall chart
-    fig, ax = plt.subplots(figsize=(10, 15))
+    fig, ax = _new_chart((10, 15))
     
     # Clean up names for better display (e.g. remove titles like Mr/Mrs if too long, or just take last name)
     # Most Titanic names are "LastName, Title. FirstName" -> we'll just use the full string but trim it
-    short_names = [n[:25] + "..." if len(n) > 25 else n for n in names]
+    short_names = names.where(names.str.len() <= 25, names.str[:25] + "...").tolist()
 
     bars = ax.barh(short_names, fares, color=PALETTE["blue"], edgecolor=PALETTE["bg"], linewidth=0.5)
     
@@ -214,8 +238,24 @@ def top_wealthiest_bar_chart() -> str:
             color=PALETTE["text"],
             fontsize=8
         )
-        
-    plt.tight_layout()
+
     logger.info("Generated top wealthiest passengers chart")
-    return fig_to_base64(fig)
+    return fig_to_svg(fig)
+
+
+# Chart name -> renderer. The agent only records which chart it picked; the
+# browser fetches the image from /chart/{name}, so any worker can serve it.
+CHARTS = {
+    "age_histogram": age_histogram,
+    "embarkation_bar_chart": embarkation_bar_chart,
+    "survival_pie_chart": survival_pie_chart,
+    "sex_distribution_pie_chart": sex_distribution_pie_chart,
+    "survival_by_class_bar_chart": survival_by_class_bar_chart,
+    "top_wealthiest_bar_chart": top_wealthiest_bar_chart,
+}
+
 
+def prerender_all() -> None:
+    """Render every chart once (at startup) so requests only hit the cache."""
+    for render in CHARTS.values():
+        render()
@@ -3,7 +3,10 @@ backend/services/data_service.py — Single responsibility: loading and querying
 All pandas operations live here. Nothing else imports pandas.
 """
 
+import glob
+import hashlib
 import logging
+import numpy as np
 import pandas as pd
 from functools import lru_cache
 import sys
@@ -15,28 +18,121 @@ from config import TITANIC_CSV_PATH
 
 logger = logging.getLogger(__name__)
 
+# Pclass gets explicit integer categories — plain "category" would parse "1".
+CATEGORICAL_DTYPES = {
+    "Sex": "category",
+    "Embarked": "category",
+    "Pclass": pd.CategoricalDtype([1, 2, 3]),
+}
+
+# Display names for coded column values, shared with chart_service
+PORT_LABELS = {"S": "Southampton", "C": "Cherbourg", "Q": "Queenstown"}
+CLASS_LABELS = {1: "First Class", 2: "Second Class", 3: "Third Class"}
+
+# The CSV never changes at runtime, so every query result below is computed
+# once and cached — a tool call after the first is a cache hit, not a scan.
+
+
+def _dataset_cache_path() -> str:
+    """
+    Pickle path for the parsed CSV, keyed on everything that shapes the frame
+    besides the CSV itself: the dtype spec and the pandas version. Changing
+    either picks a new file instead of silently loading old dtypes.
+    """
+    key = hashlib.sha1(f"{CATEGORICAL_DTYPES!r}|{pd.__version__}".encode()).hexdigest()[:10]
+    return f"{os.path.splitext(TITANIC_CSV_PATH)[0]}.{key}.pkl"
+
 
 @lru_cache(maxsize=1)
 def get_dataframe() -> pd.DataFrame:
-    """Load Titanic CSV once and cache it. Never reloads on each request."""
+    """
+    Load Titanic CSV once and cache it. Never reloads on each request.
+
+    The parsed frame (dtypes included) is pickled next to the CSV, so later
+    cold starts skip CSV tokenizing and type inference. The pickle is only
+    used while it is newer than the CSV; if it is missing, stale or unreadable,
+    the CSV is parsed again.
+    """
+    cache_path = _dataset_cache_path()
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(TITANIC_CSV_PATH):
+            logger.info(f"Loading Titanic dataset from cache: {cache_path}")
+            return pd.read_pickle(cache_path)
+    except Exception as e:
+        logger.info(f"Dataset cache unavailable ({e}), parsing CSV")
+
     logger.info(f"Loading Titanic dataset from: {TITANIC_CSV_PATH}")
-    return pd.read_csv(TITANIC_CSV_PATH)
+    # Low-cardinality columns as categoricals: comparisons, value_counts and
+    # groupby work on small integer codes instead of Python strings.
+    df = pd.read_csv(TITANIC_CSV_PATH, dtype=CATEGORICAL_DTYPES)
+
+    # Write-then-rename so concurrent workers never read a half-written file.
+    # The cache is best-effort: any failure (disk, permissions, pickling) is
+    # logged and the freshly parsed frame is still returned.
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"Could not write dataset cache {cache_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+    else:
+        _remove_stale_caches(cache_path)
+    return df
+
+
+def _remove_stale_caches(keep: str) -> None:
+    """Delete pickles left behind by an older dtype spec or pandas version."""
+    base = os.path.splitext(TITANIC_CSV_PATH)[0]
+    for path in glob.glob(f"{glob.escape(base)}.*.pkl"):
+        if os.path.abspath(path) != os.path.abspath(keep):
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # another worker got there first, or not ours to delete
 
 
+@lru_cache(maxsize=1)
+def get_summary_stats() -> dict:
+    """
+    Headline dataset numbers, aggregated once: one df.agg over the numeric
+    columns plus one value_counts for sex, instead of a column scan per figure.
+    Shared by the query functions below and the agent's system prompt.
+    """
+    df = get_dataframe()
+    agg = df.agg({"Survived": ["sum", "mean"], "Fare": "mean", "Age": "mean"})
+    sex_counts = df["Sex"].value_counts()
+    return {
+        "total": len(df),
+        "survived": int(agg.at["sum", "Survived"]),
+        "survival_rate": float(agg.at["mean", "Survived"]),
+        "male": int(sex_counts.get("male", 0)),
+        "female": int(sex_counts.get("female", 0)),
+        "avg_fare": float(agg.at["mean", "Fare"]),
+        "avg_age": float(agg.at["mean", "Age"]),  # NaN ages are skipped
+    }
+
+
+@lru_cache(maxsize=1)
 def get_male_percentage() -> str:
     """Returns the percentage of male passengers."""
-    df = get_dataframe()
-    pct = round((df["Sex"] == "male").mean() * 100, 2)
+    stats = get_summary_stats()
+    pct = round(stats["male"] / stats["total"] * 100, 2)
     return f"{pct}%"
 
 
+@lru_cache(maxsize=1)
 def get_female_percentage() -> str:
     """Returns the percentage of female passengers."""
-    df = get_dataframe()
-    pct = round((df["Sex"] == "female").mean() * 100, 2)
+    stats = get_summary_stats()
+    pct = round(stats["female"] / stats["total"] * 100, 2)
     return f"{pct}%"
 
 
+@lru_cache(maxsize=1)
 def get_average_fare() -> str:
     """Returns the average ticket fare paid by passengers."""
     df = get_dataframe()
@@ -44,28 +140,31 @@ def get_average_fare() -> str:
     return f"${avg}"
 
 
+@lru_cache(maxsize=1)
 def get_survival_rate() -> str:
     """Returns the overall survival rate as a percentage."""
-    df = get_dataframe()
-    rate = round(df["Survived"].mean() * 100, 2)
+    rate = round(get_summary_stats()["survival_rate"] * 100, 2)
     return f"{rate}%"
 
 
+@lru_cache(maxsize=1)
 def get_embarkation_counts() -> str:
     """Returns the number of passengers per embarkation port."""
     df = get_dataframe()
-    port_labels = {"S": "Southampton", "C": "Cherbourg", "Q": "Queenstown"}
-    counts = df["Embarked"].value_counts().to_dict()
-    result = {port_labels.get(k, k): v for k, v in counts.items()}
-    return str(result)
+    counts = df["Embarked"].value_counts().rename(index=PORT_LABELS)
+    return str(counts.to_dict())
 
 
-def get_age_data() -> list:
-    """Returns list of passenger ages (NaN values dropped)."""
+@lru_cache(maxsize=1)
+def get_age_data() -> np.ndarray:
+    """Returns a read-only float array of passenger ages (NaN values dropped)."""
     df = get_dataframe()
-    return df["Age"].dropna().tolist()
+    ages = df["Age"].dropna().to_numpy()
+    ages.flags.writeable = False  # shared by every caller via the cache
+    return ages
 
 
+@lru_cache(maxsize=1)
 def get_age_stats() -> str:
     """Returns mean, min and max passenger age."""
     df = get_dataframe()
@@ -77,24 +176,25 @@ def get_age_stats() -> str:
     )
 
 
+@lru_cache(maxsize=1)
 def get_total_passengers() -> str:
     """Returns the number of passenger records in the dataset (not the full Titanic manifest)."""
-    df = get_dataframe()
-    total = len(df)
+    total = get_summary_stats()["total"]
     return f"{total} records (note: this is an ML training sample, not the full ~2,224 passenger manifest)"
 
 
+@lru_cache(maxsize=1)
 def get_dataset_summary() -> str:
     """Returns a computed summary of key dataset statistics — no hardcoded values."""
-    df = get_dataframe()
-    total       = len(df)
-    survived    = int(df["Survived"].sum())
+    stats = get_summary_stats()
+    total        = stats["total"]
+    survived     = stats["survived"]
     not_survived = total - survived
-    survival_pct = round(df["Survived"].mean() * 100, 2)
-    male_count   = int((df["Sex"] == "male").sum())
-    female_count = int((df["Sex"] == "female").sum())
-    avg_fare     = round(df["Fare"].mean(), 2)
-    avg_age      = round(df["Age"].dropna().mean(), 1)
+    survival_pct = round(stats["survival_rate"] * 100, 2)
+    male_count   = stats["male"]
+    female_count = stats["female"]
+    avg_fare     = round(stats["avg_fare"], 2)
+    avg_age      = round(stats["avg_age"], 1)
     return (
         f"Dataset has {total} records. "
         f"Survived: {survived} ({survival_pct}%), "
@@ -104,27 +204,36 @@ def get_dataset_summary() -> str:
     )
 
 
+@lru_cache(maxsize=1)
 def get_class_distribution() -> str:
     """Returns the number of passengers per travel class."""
     df = get_dataframe()
-    counts = df["Pclass"].value_counts().sort_index().to_dict()
-    labels = {1: "First Class", 2: "Second Class", 3: "Third Class"}
-    result = {labels[k]: v for k, v in counts.items()}
-    return str(result)
+    counts = df["Pclass"].value_counts().sort_index().rename(index=CLASS_LABELS)
+    return str(counts.to_dict())
 
 
+@lru_cache(maxsize=8)
 def get_top_wealthiest_passengers(limit: int = 50) -> pd.DataFrame:
-    """Returns a DataFrame of the top wealthiest passengers based on Fare."""
+    """Returns a DataFrame of the top wealthiest passengers based on Fare.
+    Cached per limit — callers must not mutate the returned frame."""
     df = get_dataframe()
-    # Sort by Fare descending, drop duplicates by Name just in case, take top N
-    top_df = df.sort_values(by="Fare", ascending=False).drop_duplicates(subset=["Name"]).head(limit)
+    k = min(limit, len(df))
+    if k <= 0:
+        return df.iloc[:0]
+    # Linear-time top-k selection with argpartition, then sort only those k rows
+    idx = np.argpartition(-df["Fare"].to_numpy(), k - 1)[:k]
+    top_df = df.iloc[idx].sort_values(by="Fare", ascending=False).drop_duplicates(subset=["Name"])
+    if len(top_df) < k:
+        # Duplicate names among the picks — fall back to sorting everything
+        top_df = df.sort_values(by="Fare", ascending=False).drop_duplicates(subset=["Name"]).head(limit)
     return top_df
 
 
+@lru_cache(maxsize=1)
 def get_survival_by_sex() -> str:
     """Returns survival counts broken down by sex."""
     df = get_dataframe()
-    result = df.groupby("Sex")["Survived"].agg(["sum", "count"]).to_dict()
+    result = df.groupby("Sex", observed=True)["Survived"].agg(["sum", "count"]).to_dict()
     male_survived = result["sum"]["male"]
     male_total = result["count"]["male"]
     female_survived = result["sum"]["female"]
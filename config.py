@@ -1,16 +1,162 @@
 """
 config.py — works for both local dev and split deployment.
+
+All settings are resolved once, on first access, into a frozen Settings
+instance (get_settings()). `from config import GROQ_MODEL` keeps working: the
+module __getattr__ (PEP 562) forwards upper-case names to that instance.
 """
+import json
 import os
-from dotenv import load_dotenv
+import sys
+from dataclasses import dataclass, field, fields
+from functools import cache
+from typing import Final
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    groq_api_key: str = field(repr=False)  # keep the secret out of logs
+    groq_model: str
+    titanic_csv_path: str
+    backend_port: int
+    # Streamlit Cloud reads this to know where FastAPI is.
+    # Set it to your Railway public URL in Streamlit Cloud secrets.
+    backend_url: str
+    # Origins allowed to call the API (CORS). "*" is fine for this read-only
+    # public chatbot; set it to your Streamlit Cloud URL to lock it down.
+    # A frozenset, so the per-request origin check is a hash lookup.
+    allowed_origins: frozenset
+
+
+_SETTING_NAMES: Final = frozenset(f.name.upper() for f in fields(Settings))
+
+
+_ROOT: Final = os.path.dirname(os.path.abspath(__file__))
+_ENV_PATH: Final = os.path.join(_ROOT, ".env")
+# Pre-parsed copy of .env written by `python config.py` — one C-level
+# json.loads instead of tokenizing .env line by line on every start.
+_ENV_SNAPSHOT_PATH: Final = os.path.join(_ROOT, ".env.json")
+
+
+def _mtime(path: str):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _parse_env(path: str) -> dict:
+    """
+    Minimal .env parser: KEY=VALUE lines, optional `export ` prefix, blank
+    lines and # comments skipped. Quoted values keep their content verbatim
+    (anything after the closing quote is ignored); unquoted values drop a
+    trailing ` # comment`. No variable expansion or escapes.
+    """
+    values = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("export "):
+                line = line[7:]
+            key, sep, value = line.partition("=")
+            key = key.strip()
+            if not sep or not key:
+                continue
+            value = value.strip()
+            if value[:1] in ("\"", "'"):
+                # Quoted: take everything up to the matching closing quote and
+                # ignore what follows it (e.g. `"gsk_..."  # prod key`)
+                end = value.find(value[0], 1)
+                value = value[1:end] if end != -1 else value[1:]
+            else:
+                value = value.split(" #", 1)[0].rstrip()
+            values[key] = value
+    return values
+
+
+def _load_env() -> None:
+    """Load .env (or its JSON snapshot) into os.environ — local dev only."""
+    # .env is a local-dev convenience. Hosted deploys set real env vars, so skip
+    # the file lookup entirely there (APP_ENV=production) or when there's no file.
+    if os.getenv("APP_ENV") == "production":
+        return
+    env_mtime = _mtime(_ENV_PATH)
+    if env_mtime is None:
+        return  # no .env — a leftover snapshot must not resurrect deleted values
+
+    # The snapshot is only trusted while it's at least as new as .env
+    snapshot_mtime = _mtime(_ENV_SNAPSHOT_PATH)
+    if snapshot_mtime is not None and snapshot_mtime >= env_mtime:
+        try:
+            with open(_ENV_SNAPSHOT_PATH, "rb") as f:
+                values = json.loads(f.read())
+            # str(): a hand-edited snapshot may hold numbers/bools
+            values = {str(k): str(v) for k, v in values.items()}
+        except (OSError, ValueError, AttributeError):
+            pass  # unreadable or not a JSON object — fall back to parsing .env
+        else:
+            for key, value in values.items():
+                os.environ.setdefault(key, value)
+            return
+
+    for key, value in _parse_env(_ENV_PATH).items():
+        os.environ.setdefault(key, value)
+
+
+def write_env_snapshot() -> None:
+    """Parse .env and write it to .env.json for faster startup."""
+    values = _parse_env(_ENV_PATH)
+    tmp_path = f"{_ENV_SNAPSHOT_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(values, f)
+    os.replace(tmp_path, _ENV_SNAPSHOT_PATH)
+
+
+def _int_env(name: str, default: int) -> int:
+    """Integer env var; unset or non-numeric values fall back to the default."""
+    value = os.environ.get(name, "").strip()
+    # isascii() too: isdigit() accepts characters like "²" that int() rejects
+    return int(value) if value.isascii() and value.isdigit() else default
+
+
+def _parse_origins(raw: str) -> frozenset:
+    """Comma-separated origins -> frozenset; a "*" entry makes the rest redundant."""
+    origins = frozenset(o.strip() for o in raw.split(",") if o.strip())
+    return frozenset({"*"}) if "*" in origins else origins
+
+
+@cache
+def get_settings() -> Settings:
+    """Read the environment once per process and return the shared Settings."""
+    _load_env()
+    backend_port = _int_env("PORT", _int_env("BACKEND_PORT", 8000))
+    # Only build the localhost default when BACKEND_URL isn't set (or is empty)
+    backend_url = os.environ.get("BACKEND_URL") or f"http://localhost:{backend_port}"
+    return Settings(
+        groq_api_key=os.getenv("GROQ_API_KEY", ""),
+        # Interned so every consumer shares a single string object
+        groq_model=sys.intern(os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")),
+        titanic_csv_path=os.getenv("TITANIC_CSV_PATH", "titanic.csv"),
+        backend_port=backend_port,
+        backend_url=sys.intern(backend_url),
+        allowed_origins=_parse_origins(os.getenv("ALLOWED_ORIGINS", "*")),
+    )
+
+
+def __getattr__(name: str):
+    if name in _SETTING_NAMES:
+        return getattr(get_settings(), name.lower())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-load_dotenv()
+def __dir__() -> list:
+    return sorted(set(globals()) | _SETTING_NAMES)
 
-GROQ_API_KEY     = os.getenv("GROQ_API_KEY", "")
-GROQ_MODEL       = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
-TITANIC_CSV_PATH = os.getenv("TITANIC_CSV_PATH", "titanic.csv")
-BACKEND_PORT     = int(os.getenv("PORT", os.getenv("BACKEND_PORT", "8000")))
 
-# Streamlit Cloud reads this to know where FastAPI is.
-# Set it to your Railway public URL in Streamlit Cloud secrets.
-BACKEND_URL = os.getenv("BACKEND_URL", f"http://localhost:{BACKEND_PORT}")
\ No newline at end of file
+if __name__ == "__main__":
+    if not os.path.isfile(_ENV_PATH):
+        sys.exit(f"No .env found at {_ENV_PATH} — nothing to snapshot.")
+    write_env_snapshot()
+    print(f"Wrote {_ENV_SNAPSHOT_PATH}")
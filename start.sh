@@ -1,4 +1,10 @@
 #!/bin/sh
 # start.sh — FastAPI only. Streamlit runs on Streamlit Cloud.
 echo "Starting FastAPI on port ${PORT:-8000}..."
-exec uvicorn backend.main:app --host 0.0.0.0 --port ${PORT:-8000} --log-level info
\ No newline at end of file
+# Separate worker processes give true parallelism past the GIL. uvicorn's
+# default loop/http "auto" picks uvloop and httptools when they're installed
+# and falls back to asyncio/h11 where they aren't (e.g. Windows).
+# Keep-alive is raised from 5 s so the UI's requests can reuse connections.
+exec uvicorn backend.main:app --host 0.0.0.0 --port ${PORT:-8000} \
+    --workers ${WEB_CONCURRENCY:-2} \
+    --timeout-keep-alive 30 --no-access-log --log-level info
\ No newline at end of file
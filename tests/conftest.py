@@ -0,0 +1,9 @@
+"""
+tests/conftest.py — make the project root importable (config, backend.*),
+the same way the backend services add it to sys.path.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
@@ -0,0 +1,44 @@
+"""
+tests/test_agent_service.py — per-request chart registry isolation in run_agent,
+using a fake graph in place of the LLM agent.
+"""
+
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from backend.services import agent_service
+
+
+class _FakeGraph:
+    """Calls the chart tool named by the question, interleaving with other runs."""
+
+    async def ainvoke(self, inputs):
+        question = inputs["messages"][-1].content
+        chart_tool, delay_before, delay_after = {
+            "age": (agent_service.age_histogram, 0.02, 0),
+            "survival": (agent_service.survival_pie_chart, 0, 0.04),
+        }[question]
+        await asyncio.sleep(delay_before)
+        # Like LangChain: the sync tool runs in a worker thread with a copy of
+        # the caller's context
+        await asyncio.to_thread(chart_tool.invoke, {})
+        await asyncio.sleep(delay_after)
+        return {"messages": [AIMessage(content=f"{question} answer")]}
+
+
+def test_concurrent_runs_keep_their_own_chart(monkeypatch):
+    monkeypatch.setattr(agent_service, "_agent", _FakeGraph())
+
+    async def both():
+        return await asyncio.gather(agent_service.run_agent("age"), agent_service.run_agent("survival"))
+
+    age, survival = asyncio.run(both())
+    assert age == {"answer": "age answer", "chart_type": "age_histogram"}
+    assert survival == {"answer": "survival answer", "chart_type": "survival_pie_chart"}
+
+
+def test_tool_outside_a_run_records_nothing():
+    # No registry bound in this context — the tool still answers, nothing leaks
+    assert agent_service.age_histogram.invoke({})
+    assert agent_service._chart_registry.get(None) is None
@@ -0,0 +1,31 @@
+"""
+tests/test_config.py — the built-in .env parser (config._parse_env).
+"""
+
+import config
+
+
+def _parse(tmp_path, text: str) -> dict:
+    env = tmp_path / ".env"
+    env.write_text(text, encoding="utf-8")
+    return config._parse_env(str(env))
+
+
+def test_quoted_values_are_unwrapped(tmp_path):
+    values = _parse(tmp_path, "A=\"double\"\nB='single'\nC=\"has # hash\"\n")
+    assert values == {"A": "double", "B": "single", "C": "has # hash"}
+
+
+def test_quoted_value_followed_by_comment(tmp_path):
+    values = _parse(tmp_path, "GROQ_API_KEY=\"gsk_abc\"  # prod key\nB='x y' # note\n")
+    assert values == {"GROQ_API_KEY": "gsk_abc", "B": "x y"}
+
+
+def test_unquoted_value_with_comment(tmp_path):
+    values = _parse(tmp_path, "PORT=8000 # local\nURL=http://a#frag\n")
+    assert values == {"PORT": "8000", "URL": "http://a#frag"}
+
+
+def test_comments_blanks_export_and_malformed_lines(tmp_path):
+    values = _parse(tmp_path, "# comment\n\nexport KEY=value\nNO_EQUALS\n=novalue\nEMPTY=\n")
+    assert values == {"KEY": "value", "EMPTY": ""}
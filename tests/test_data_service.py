@@ -0,0 +1,41 @@
+"""
+tests/test_data_service.py — get_top_wealthiest_passengers against the plain
+sort-based selection it replaced.
+"""
+
+import pandas as pd
+import pytest
+
+from backend.services import data_service
+
+# The uncached function, so a test can point it at its own frame
+_top_wealthiest = data_service.get_top_wealthiest_passengers.__wrapped__
+
+
+def _sort_based(df: pd.DataFrame, limit: int) -> pd.DataFrame:
+    return df.sort_values(by="Fare", ascending=False).drop_duplicates(subset=["Name"]).head(limit)
+
+
+def _assert_same_selection(got: pd.DataFrame, expected: pd.DataFrame):
+    # Rows tied on Fare may come back in either order (or, at the cut-off,
+    # either tied row), so compare the fares and check the names are unique
+    assert got["Fare"].tolist() == expected["Fare"].tolist()
+    assert got["Name"].is_unique
+
+
+@pytest.mark.parametrize("limit", [0, 1, 2, 3, 5, 10, 50, 10_000])
+def test_matches_sort_based_result(limit):
+    df = data_service.get_dataframe()
+    _assert_same_selection(_top_wealthiest(limit), _sort_based(df, limit))
+
+
+def test_ties_and_duplicate_names(monkeypatch):
+    df = pd.DataFrame({
+        "Name": ["a", "b", "a", "c", "d", "e"],
+        "Fare": [100.0, 100.0, 100.0, 50.0, 50.0, 10.0],
+    })
+    monkeypatch.setattr(data_service, "get_dataframe", lambda: df)
+    for limit in range(0, 8):
+        got = _top_wealthiest(limit)
+        _assert_same_selection(got, _sort_based(df, limit))
+        assert len(got) == min(limit, df["Name"].nunique())
@@ -0,0 +1,70 @@
+"""
+tests/test_main.py — HTTP behaviour of the FastAPI app: /ui caching and
+encoding negotiation, and /chart/{name}.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main
+
+
+@pytest.fixture(scope="module")
+def client():
+    # No `with`: skip the lifespan warm-up, these routes don't need the agent
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "encoding", "etag"),
+    [
+        ("gzip, deflate", "gzip", main._CHAT_UI_GZ_ETAG),
+        ("identity", None, main._CHAT_UI_ETAG),
+        ("gzip;q=0, identity", None, main._CHAT_UI_ETAG),
+    ],
+)
+def test_ui_200_then_304(client, accept_encoding, encoding, etag):
+    headers = {"Accept-Encoding": accept_encoding}
+    res = client.get("/ui", headers=headers)
+    assert res.status_code == 200
+    assert res.headers.get("content-encoding") == encoding
+    assert res.headers["etag"] == etag
+    assert "Accept-Encoding" in res.headers["vary"]
+    assert res.content == main._CHAT_UI  # httpx decodes gzip transparently
+
+    res = client.get("/ui", headers={**headers, "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["etag"] == etag
+    assert res.content == b""
+
+
+def test_ui_etags_differ_per_encoding(client):
+    assert main._CHAT_UI_ETAG != main._CHAT_UI_GZ_ETAG
+    # The gzip variant's validator must not revalidate the identity body
+    res = client.get("/ui", headers={"Accept-Encoding": "identity", "If-None-Match": main._CHAT_UI_GZ_ETAG})
+    assert res.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        "*",
+        f'"other", {main._CHAT_UI_ETAG}',
+        f"W/{main._CHAT_UI_ETAG}",
+    ],
+)
+def test_ui_if_none_match_list_and_weak(client, if_none_match):
+    res = client.get("/ui", headers={"Accept-Encoding": "identity", "If-None-Match": if_none_match})
+    assert res.status_code == 304
+
+
+def test_chart_known(client):
+    res = client.get("/chart/age_histogram")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("image/svg+xml")
+    assert b"<svg" in res.content
+
+
+def test_chart_unknown(client):
+    res = client.get("/chart/not_a_chart")
+    assert res.status_code == 404